@@ -0,0 +1,16 @@
+from .base_backend import ArchiveBackend, ExternalArchiverBackend
+from .rar_backend import RarBackend
+from .seven_zip_backend import SevenZipBackend
+from .zip_backend import ZipBackend
+
+
+ARCHIVE_BACKENDS: dict[str, type[ArchiveBackend]] = {
+    backend.name: backend for backend in (RarBackend, ZipBackend, SevenZipBackend)
+}
+
+
+def get_archive_backend(name: str, **backend_kwargs) -> ArchiveBackend:
+    if name not in ARCHIVE_BACKENDS:
+        raise ValueError(f"Unknown archive backend '{name}', available backends: {sorted(ARCHIVE_BACKENDS)}.")
+
+    return ARCHIVE_BACKENDS[name](**backend_kwargs)
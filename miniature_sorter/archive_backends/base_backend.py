@@ -0,0 +1,80 @@
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+import os
+from pathlib import Path
+import subprocess
+import uuid
+
+
+class ArchiveBackend(ABC):
+    """Packs a single folder into an archive, keeping the folder itself as the top-level entry.
+
+    An existing archive at the output path is replaced only once the new one is complete, so a failed run keeps it.
+    """
+
+    name = ""
+    extension = ""
+
+    @abstractmethod
+    def compress_folder(
+        self,
+        folder_path: Path,
+        output_path: Path,
+    ) -> None:
+        pass
+
+    @staticmethod
+    @contextmanager
+    def _partial_output(output_path: Path) -> Iterator[Path]:
+        """Yields a temporary path next to `output_path` and moves it into place if no exception was raised.
+
+        The name is unique per writer, so several workers archiving the same folder do not write into the same
+        file, and the last one to finish wins. The archive extension is kept, as some archivers append it otherwise.
+        """
+        partial_path = output_path.with_name(
+            f"{output_path.stem}.{os.getpid()}-{uuid.uuid4().hex[:8]}.partial{output_path.suffix}",
+        )
+        try:
+            yield partial_path
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+
+        partial_path.replace(output_path)
+
+
+class ExternalArchiverBackend(ArchiveBackend):
+    """Runs an archiver binary on the folder, writing to a temporary archive which replaces the output on success."""
+
+    def compress_folder(
+        self,
+        folder_path: Path,
+        output_path: Path,
+    ) -> None:
+        binary = self._find_binary()
+        with self._partial_output(output_path) as partial_path:
+            # run inside the parent to avoid absolute paths inside archive
+            proc = subprocess.run(
+                self._build_command(binary, partial_path, folder_path.name),
+                cwd=folder_path.parent,
+                check=False,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+            )
+
+            if proc.returncode != 0:
+                raise RuntimeError(proc.stderr.decode(errors="replace"))
+
+    @abstractmethod
+    def _find_binary(self) -> str:
+        pass
+
+    @abstractmethod
+    def _build_command(
+        self,
+        binary: str,
+        archive_path: Path,
+        folder_name: str,
+    ) -> list[str]:
+        pass
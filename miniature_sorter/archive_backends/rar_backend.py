@@ -0,0 +1,26 @@
+import shutil
+from pathlib import Path
+
+from miniature_sorter.archive_backends.base_backend import ExternalArchiverBackend
+
+
+class RarBackend(ExternalArchiverBackend):
+    name = "rar"
+    extension = ".rar"
+
+    def __init__(self, binary: str = "rar") -> None:
+        self.binary = binary
+
+    def _find_binary(self) -> str:
+        if shutil.which(self.binary) is None:
+            raise RuntimeError(f"'{self.binary}' binary was not found, try another archive backend.")
+
+        return self.binary
+
+    def _build_command(
+        self,
+        binary: str,
+        archive_path: Path,
+        folder_name: str,
+    ) -> list[str]:
+        return [binary, "a", str(archive_path), folder_name]
@@ -0,0 +1,35 @@
+import os
+import shutil
+from pathlib import Path
+
+from miniature_sorter.archive_backends.base_backend import ExternalArchiverBackend
+
+
+class SevenZipBackend(ExternalArchiverBackend):
+    name = "7z"
+    extension = ".7z"
+    BINARY_CANDIDATES = ("7zz", "7z", "7za")
+
+    def __init__(
+        self,
+        binary: str | None = None,
+        max_workers: int | None = None,
+    ) -> None:
+        self.binary = binary
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def _build_command(
+        self,
+        binary: str,
+        archive_path: Path,
+        folder_name: str,
+    ) -> list[str]:
+        return [binary, "a", "-t7z", f"-mmt{self.max_workers}", "-bd", str(archive_path), folder_name]
+
+    def _find_binary(self) -> str:
+        candidates = self.BINARY_CANDIDATES if self.binary is None else (self.binary,)
+        for candidate in candidates:
+            if shutil.which(candidate) is not None:
+                return candidate
+
+        raise RuntimeError(f"None of {candidates} binaries were found, try another archive backend.")
@@ -0,0 +1,167 @@
+from pathlib import Path
+import random
+import shutil
+import sys
+import tempfile
+import zipfile
+
+import pytest
+
+from miniature_sorter.archive_backends import (
+    ArchiveBackend,
+    RarBackend,
+    SevenZipBackend,
+    ZipBackend,
+    get_archive_backend,
+    zip_backend,
+)
+from miniature_sorter.rar_handler import RarHandler
+
+
+def build_model_folder(folder_path: Path) -> dict[str, bytes]:
+    rng = random.Random(0)
+    files = {
+        "Models/STL/mimic.stl": b"facet normal 0 0 1\n" * 5000,
+        "Models/STL/mimic_base.stl": rng.randbytes(20000),
+        "Models/LYS/mimic.lys": b"",
+        "Mimic.png": rng.randbytes(3000),
+    }
+    for name, content in files.items():
+        file_path = folder_path / name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(content)
+    (folder_path / "Models/Empty").mkdir()
+
+    return {f"{folder_path.name}/{name}": content for name, content in files.items()}
+
+
+def check_archive(
+    archive_path: Path,
+    expected_files: dict[str, bytes],
+) -> None:
+    with zipfile.ZipFile(archive_path) as archive:
+        assert archive.testzip() is None
+        for name, content in expected_files.items():
+            assert archive.read(name) == content
+        assert "22. Mimic/Models/Empty/" in archive.namelist()
+
+
+def test_chunked_parallel_compression():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        expected_files = build_model_folder(temp_dir / "22. Mimic")
+        backend = ZipBackend(max_workers=4)
+        backend.CHUNK_SIZE = 4096
+
+        RarHandler.compress_single_folder(temp_dir / "22. Mimic", temp_dir / "22. Mimic.zip", backend=backend)
+
+        check_archive(temp_dir / "22. Mimic.zip", expected_files)
+        assert sorted(path.name for path in temp_dir.iterdir()) == ["22. Mimic", "22. Mimic.zip"]
+
+
+def test_zip64_records(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(zip_backend, "ZIP64_THRESHOLD", 0)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        expected_files = build_model_folder(temp_dir / "22. Mimic")
+
+        get_archive_backend("zip").compress_folder(temp_dir / "22. Mimic", temp_dir / "22. Mimic.zip")
+
+        check_archive(temp_dir / "22. Mimic.zip", expected_files)
+
+
+def test_folders_in_folder_use_backend_extension():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        build_model_folder(temp_dir / "source/22. Mimic")
+        (temp_dir / "output").mkdir()
+
+        RarHandler.compress_folders_in_folder(temp_dir / "source", temp_dir / "output", backend=ZipBackend())
+
+        assert (temp_dir / "output/22. Mimic.zip").exists()
+
+
+def test_stored_members_have_no_data_descriptor():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        expected_files = build_model_folder(temp_dir / "22. Mimic")
+
+        ZipBackend().compress_folder(temp_dir / "22. Mimic", temp_dir / "22. Mimic.zip")
+
+        with zipfile.ZipFile(temp_dir / "22. Mimic.zip") as archive:
+            image_info = archive.getinfo("22. Mimic/Mimic.png")
+            assert image_info.compress_type == zipfile.ZIP_STORED
+            assert not image_info.flag_bits & zip_backend.DATA_DESCRIPTOR_FLAG
+
+        with (temp_dir / "22. Mimic.zip").open("rb") as f:
+            f.seek(image_info.header_offset)
+            local_header = zip_backend.LOCAL_HEADER.unpack(f.read(zip_backend.LOCAL_HEADER.size))
+        crc, compress_size, file_size = local_header[6:9]
+        assert crc == image_info.CRC
+        assert compress_size == file_size == len(expected_files["22. Mimic/Mimic.png"])
+
+
+def test_failed_compression_keeps_previous_archive(monkeypatch: pytest.MonkeyPatch):
+    def broken_chunk(*args, **kwargs):
+        raise OSError("NAS went away")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        build_model_folder(temp_dir / "22. Mimic")
+        output_path = temp_dir / "22. Mimic.zip"
+        output_path.write_bytes(b"previous archive")
+
+        monkeypatch.setattr(ZipBackend, "_compress_chunk", broken_chunk)
+        with pytest.raises(OSError):
+            RarHandler.compress_single_folder(temp_dir / "22. Mimic", output_path, backend=ZipBackend())
+
+        assert output_path.read_bytes() == b"previous archive"
+        assert sorted(path.name for path in temp_dir.iterdir()) == ["22. Mimic", "22. Mimic.zip"]
+
+
+def test_failed_archiver_keeps_previous_archive():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        build_model_folder(temp_dir / "22. Mimic")
+        output_path = temp_dir / "22. Mimic.rar"
+        output_path.write_bytes(b"previous archive")
+
+        # The Python interpreter fails on the rar command line, like a broken archiver would.
+        with pytest.raises(RuntimeError):
+            RarHandler.compress_single_folder(temp_dir / "22. Mimic", output_path, backend=RarBackend(sys.executable))
+
+        assert output_path.read_bytes() == b"previous archive"
+        assert sorted(path.name for path in temp_dir.iterdir()) == ["22. Mimic", "22. Mimic.rar"]
+
+
+def test_partial_archives_are_unique_per_writer():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = Path(temp_dir) / "22. Mimic.zip"
+        with ZipBackend._partial_output(output_path) as first, ZipBackend._partial_output(output_path) as second:
+            assert first != second
+            assert first.suffix == second.suffix == ".zip"
+            first.write_bytes(b"first")
+            second.write_bytes(b"second")
+
+        assert output_path.read_bytes() == b"first"
+
+
+def test_incomplete_backend_cannot_be_created():
+    class IncompleteBackend(ArchiveBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteBackend()
+
+
+@pytest.mark.skipif(shutil.which("7z") is None, reason="7z binary is not installed.")
+def test_seven_zip_backend():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        build_model_folder(temp_dir / "22. Mimic")
+        output_path = temp_dir / "22. Mimic.7z"
+        output_path.write_bytes(b"previous archive")
+
+        RarHandler.compress_single_folder(temp_dir / "22. Mimic", output_path, backend=SevenZipBackend(binary="7z"))
+
+        assert output_path.read_bytes()[:6] == b"7z\xbc\xaf\x27\x1c"
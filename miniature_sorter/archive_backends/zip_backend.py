@@ -0,0 +1,420 @@
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import stat
+import struct
+import time
+from typing import BinaryIO
+import zlib
+
+from miniature_sorter.archive_backends.base_backend import ArchiveBackend
+
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+ZIP64_LIMIT = (1 << 32) - 1
+ZIP64_THRESHOLD = ZIP64_LIMIT
+ZIP64_COUNT_LIMIT = (1 << 16) - 1
+
+UTF8_FLAG = 0x800
+DATA_DESCRIPTOR_FLAG = 0x08
+MS_DOS_DIRECTORY_FLAG = 0x10
+UNIX_VERSION_MADE_BY = (3 << 8) | 45
+
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+DATA_DESCRIPTOR = struct.Struct("<IIII")
+DATA_DESCRIPTOR_64 = struct.Struct("<IIQQ")
+END_OF_CENTRAL_DIRECTORY = struct.Struct("<IHHHHIIH")
+END_OF_CENTRAL_DIRECTORY_64 = struct.Struct("<IQHHIIQQQQ")
+END_OF_CENTRAL_DIRECTORY_64_LOCATOR = struct.Struct("<IIQI")
+
+
+@dataclass
+class _ZipMember:
+    path: Path
+    arcname: str
+    size: int
+    mtime: float
+    mode: int
+    is_dir: bool
+
+
+@dataclass
+class _ZipEntry:
+    name: bytes
+    dos_time: int
+    dos_date: int
+    external_attr: int
+    compress_type: int
+    flags: int
+    header_offset: int
+    zip64: bool
+    crc: int = 0
+    compress_size: int = 0
+    file_size: int = 0
+
+
+class _ZipStreamWriter:
+    """Writes ZIP records sequentially, without seeking back in the output.
+
+    Sizes and CRC of deflated members are written in data descriptors after their data, so the local header
+    can be written before the member is compressed. Stored members are checksummed first and get real values
+    in their local header instead. ZIP64 records are used where sizes, offsets or the number of
+    entries do not fit into the classic format.
+    """
+
+    def __init__(self, output: BinaryIO) -> None:
+        self.output = output
+        self.offset = 0
+        self.entries: list[_ZipEntry] = []
+
+    def start_member(
+        self,
+        member: _ZipMember,
+        compress_type: int,
+        crc: int | None = None,
+        file_size: int | None = None,
+    ) -> _ZipEntry:
+        """Writes the local header of a member.
+
+        When `crc` and `file_size` are given, as for stored members, they go into the header and no data
+        descriptor follows the data. Streaming readers reject stored members with a data descriptor.
+        """
+        dos_time, dos_date = self._dos_timestamp(member.mtime)
+        external_attr = (member.mode & 0xFFFF) << 16
+        if member.is_dir:
+            external_attr |= MS_DOS_DIRECTORY_FLAG
+        flags = UTF8_FLAG
+        sizes_known = crc is not None and file_size is not None
+        if not sizes_known:
+            flags |= DATA_DESCRIPTOR_FLAG
+
+        # Deflate may slightly grow incompressible data, hence the margin.
+        zip64 = (file_size if sizes_known else member.size * 1.05) > ZIP64_THRESHOLD
+        entry = _ZipEntry(
+            name=member.arcname.encode("utf-8"),
+            dos_time=dos_time,
+            dos_date=dos_date,
+            external_attr=external_attr,
+            compress_type=compress_type,
+            flags=flags,
+            header_offset=self.offset,
+            zip64=zip64,
+        )
+
+        known_size = file_size if sizes_known else 0
+        extra = struct.pack("<HHQQ", 1, 16, known_size, known_size) if zip64 else b""
+        header_size = ZIP64_LIMIT if zip64 else known_size
+        self.write(
+            LOCAL_HEADER.pack(
+                0x04034B50,
+                45 if zip64 else 20,
+                flags,
+                compress_type,
+                dos_time,
+                dos_date,
+                crc if sizes_known else 0,
+                header_size,
+                header_size,
+                len(entry.name),
+                len(extra),
+            ),
+        )
+        self.write(entry.name)
+        self.write(extra)
+        self.entries.append(entry)
+        return entry
+
+    def finish_member(
+        self,
+        entry: _ZipEntry,
+        crc: int,
+        compress_size: int,
+        file_size: int,
+    ) -> None:
+        entry.crc = crc
+        entry.compress_size = compress_size
+        entry.file_size = file_size
+        if not entry.flags & DATA_DESCRIPTOR_FLAG:
+            return
+
+        if entry.zip64:
+            self.write(DATA_DESCRIPTOR_64.pack(0x08074B50, crc, compress_size, file_size))
+        elif max(compress_size, file_size) > ZIP64_THRESHOLD:
+            raise RuntimeError(f"{entry.name.decode()} grew past 4 GiB while it was being compressed.")
+        else:
+            self.write(DATA_DESCRIPTOR.pack(0x08074B50, crc, compress_size, file_size))
+
+    def write(self, data: bytes) -> None:
+        self.output.write(data)
+        self.offset += len(data)
+
+    def close(self) -> None:
+        central_directory_offset = self.offset
+        for entry in self.entries:
+            needs_zip64 = max(entry.compress_size, entry.file_size, entry.header_offset) > ZIP64_THRESHOLD
+            extra = b""
+            if needs_zip64:
+                extra = struct.pack("<HHQQQ", 1, 24, entry.file_size, entry.compress_size, entry.header_offset)
+            self.write(
+                CENTRAL_HEADER.pack(
+                    0x02014B50,
+                    UNIX_VERSION_MADE_BY,
+                    45 if needs_zip64 or entry.zip64 else 20,
+                    entry.flags,
+                    entry.compress_type,
+                    entry.dos_time,
+                    entry.dos_date,
+                    entry.crc,
+                    ZIP64_LIMIT if needs_zip64 else entry.compress_size,
+                    ZIP64_LIMIT if needs_zip64 else entry.file_size,
+                    len(entry.name),
+                    len(extra),
+                    0,
+                    0,
+                    0,
+                    entry.external_attr,
+                    ZIP64_LIMIT if needs_zip64 else entry.header_offset,
+                ),
+            )
+            self.write(entry.name)
+            self.write(extra)
+
+        central_directory_size = self.offset - central_directory_offset
+        n_entries = len(self.entries)
+        if max(central_directory_offset, central_directory_size) > ZIP64_THRESHOLD or n_entries > ZIP64_COUNT_LIMIT:
+            end_of_central_directory_64_offset = self.offset
+            self.write(
+                END_OF_CENTRAL_DIRECTORY_64.pack(
+                    0x06064B50,
+                    END_OF_CENTRAL_DIRECTORY_64.size - 12,
+                    UNIX_VERSION_MADE_BY,
+                    45,
+                    0,
+                    0,
+                    n_entries,
+                    n_entries,
+                    central_directory_size,
+                    central_directory_offset,
+                ),
+            )
+            self.write(END_OF_CENTRAL_DIRECTORY_64_LOCATOR.pack(0x07064B50, 0, end_of_central_directory_64_offset, 1))
+            n_entries = min(n_entries, ZIP64_COUNT_LIMIT)
+            central_directory_size = min(central_directory_size, ZIP64_LIMIT)
+            central_directory_offset = min(central_directory_offset, ZIP64_LIMIT)
+
+        self.write(
+            END_OF_CENTRAL_DIRECTORY.pack(
+                0x06054B50,
+                0,
+                0,
+                n_entries,
+                n_entries,
+                central_directory_size,
+                central_directory_offset,
+                0,
+            ),
+        )
+
+    @staticmethod
+    def _dos_timestamp(mtime: float) -> tuple[int, int]:
+        year, month, day, hour, minute, second = time.localtime(mtime)[:6]
+        if year < 1980:
+            year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+
+        return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+class ZipBackend(ArchiveBackend):
+    """Writes ZIP archives in-process, compressing members in parallel on a thread pool.
+
+    Files are split into chunks which are deflated independently, each primed with the tail of the previous
+    chunk as a dictionary, and concatenated into one deflate stream per member. zlib releases the GIL, so
+    all cores work even inside a single large file. Chunks are written to the output in order as soon as
+    they are ready, and at most a couple of chunks per worker are kept in memory.
+    """
+
+    name = "zip"
+    extension = ".zip"
+    CHUNK_SIZE = 4 * 1024 * 1024
+    DICTIONARY_SIZE = 32 * 1024
+    STORED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".zip", ".rar", ".7z"}
+
+    def __init__(
+        self,
+        compression_level: int = 6,
+        max_workers: int | None = None,
+    ) -> None:
+        self.compression_level = compression_level
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def compress_folder(
+        self,
+        folder_path: Path,
+        output_path: Path,
+    ) -> None:
+        members = self._collect_members(folder_path)
+        with (
+            self._partial_output(output_path) as partial_path,
+            ThreadPoolExecutor(max_workers=self.max_workers) as executor,
+            partial_path.open("wb") as output,
+        ):
+            self._write_archive(members, executor, _ZipStreamWriter(output))
+
+    def _write_archive(
+        self,
+        members: list[_ZipMember],
+        executor: ThreadPoolExecutor,
+        writer: _ZipStreamWriter,
+    ) -> None:
+        entry = None
+        crc = compress_size = file_size = 0
+        for member, compress_type, is_first, is_last, result in self._iter_chunks(members, executor):
+            if compress_type == ZIP_STORED:
+                crc, file_size = result
+                entry = writer.start_member(member, ZIP_STORED, crc=crc, file_size=file_size)
+                self._copy_stored(member, writer, crc, file_size)
+                writer.finish_member(entry, crc, file_size, file_size)
+                continue
+
+            data, compressed = result
+            if is_first:
+                entry = writer.start_member(member, compress_type)
+                crc = compress_size = file_size = 0
+
+            crc = zlib.crc32(data, crc)
+            writer.write(compressed)
+            compress_size += len(compressed)
+            file_size += len(data)
+
+            if is_last:
+                writer.finish_member(entry, crc, compress_size, file_size)
+
+        writer.close()
+
+    def _iter_chunks(
+        self,
+        members: list[_ZipMember],
+        executor: ThreadPoolExecutor,
+    ) -> Iterator[tuple[_ZipMember, int, bool, bool, tuple]]:
+        """Yields chunk results in archive order.
+
+        A deflated member gives one ``(data, compressed)`` result per chunk. A stored member gives a single
+        ``(crc, size)`` result, so that its header can be written with real values before its data.
+        """
+        max_pending = 2 * self.max_workers
+        pending: deque[tuple[_ZipMember, int, bool, bool, Future]] = deque()
+        for member in members:
+            compress_type = self._compress_type(member)
+            if compress_type == ZIP_STORED:
+                pending.append((member, compress_type, True, True, executor.submit(self._checksum_member, member)))
+            else:
+                n_chunks = max(1, -(-member.size // self.CHUNK_SIZE))
+                for chunk_index in range(n_chunks):
+                    is_last = chunk_index == n_chunks - 1
+                    future = executor.submit(self._compress_chunk, member, chunk_index * self.CHUNK_SIZE, is_last)
+                    pending.append((member, compress_type, chunk_index == 0, is_last, future))
+
+            while len(pending) >= max_pending:
+                *chunk_description, future = pending.popleft()
+                yield *chunk_description, future.result()
+
+        while pending:
+            *chunk_description, future = pending.popleft()
+            yield *chunk_description, future.result()
+
+    def _compress_chunk(
+        self,
+        member: _ZipMember,
+        offset: int,
+        is_last: bool,
+    ) -> tuple[bytes, bytes]:
+        compressor_kwargs = {}
+        with member.path.open("rb") as f:
+            if offset > 0:
+                dictionary_start = max(0, offset - self.DICTIONARY_SIZE)
+                f.seek(dictionary_start)
+                compressor_kwargs["zdict"] = f.read(offset - dictionary_start)
+            # The last chunk takes whatever the file has grown to, so that the member is never cut short.
+            data = f.read() if is_last else f.read(self.CHUNK_SIZE)
+
+        compressor = zlib.compressobj(self.compression_level, zlib.DEFLATED, -zlib.MAX_WBITS, **compressor_kwargs)
+        compressed = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if is_last else zlib.Z_SYNC_FLUSH)
+        return data, compressed
+
+    def _checksum_member(self, member: _ZipMember) -> tuple[int, int]:
+        crc = file_size = 0
+        if member.is_dir:
+            return crc, file_size
+
+        with member.path.open("rb") as f:
+            while data := f.read(self.CHUNK_SIZE):
+                crc = zlib.crc32(data, crc)
+                file_size += len(data)
+
+        return crc, file_size
+
+    def _copy_stored(
+        self,
+        member: _ZipMember,
+        writer: _ZipStreamWriter,
+        expected_crc: int,
+        expected_size: int,
+    ) -> None:
+        if member.is_dir:
+            return
+
+        crc = file_size = 0
+        with member.path.open("rb") as f:
+            while file_size < expected_size and (data := f.read(min(self.CHUNK_SIZE, expected_size - file_size))):
+                crc = zlib.crc32(data, crc)
+                file_size += len(data)
+                writer.write(data)
+
+        if (crc, file_size) != (expected_crc, expected_size):
+            raise RuntimeError(f"{member.path} changed while it was being archived.")
+
+    def _compress_type(self, member: _ZipMember) -> int:
+        if member.is_dir or member.size == 0 or member.path.suffix.lower() in self.STORED_EXTENSIONS:
+            return ZIP_STORED
+
+        return ZIP_DEFLATED
+
+    @staticmethod
+    def _collect_members(folder_path: Path) -> list[_ZipMember]:
+        members = []
+        for root, folder_names, file_names in os.walk(folder_path):
+            folder_names.sort()
+            root_path = Path(root)
+            root_stat = root_path.stat()
+            members.append(
+                _ZipMember(
+                    path=root_path,
+                    arcname=root_path.relative_to(folder_path.parent).as_posix() + "/",
+                    size=0,
+                    mtime=root_stat.st_mtime,
+                    mode=root_stat.st_mode,
+                    is_dir=True,
+                ),
+            )
+            for file_name in sorted(file_names):
+                file_path = root_path / file_name
+                file_stat = file_path.stat()
+                if not stat.S_ISREG(file_stat.st_mode):
+                    continue
+                members.append(
+                    _ZipMember(
+                        path=file_path,
+                        arcname=file_path.relative_to(folder_path.parent).as_posix(),
+                        size=file_stat.st_size,
+                        mtime=file_stat.st_mtime,
+                        mode=file_stat.st_mode,
+                        is_dir=False,
+                    ),
+                )
+
+        return members
@@ -0,0 +1,9 @@
+from .base_connector import BaseConnector
+from .registry import (
+    CONNECTORS,
+    ConnectorSpec,
+    detect_connector_name,
+    get_connector,
+    get_connector_class,
+    register_connector,
+)
@@ -0,0 +1,390 @@
+from abc import ABC, abstractmethod
+from copy import deepcopy
+import os
+from pathlib import Path
+import shutil
+import threading
+from collections.abc import Iterable, Collection, Mapping
+
+from miniature_sorter import logger
+from miniature_sorter.artist_connectors.exceptions import (
+    ImageNotFoundException,
+    MultipleImagesFoundException,
+)
+from miniature_sorter.staged_output import CopyJournal, StagedModelOutput
+
+
+class BaseConnector(ABC):
+    """Shared sorting engine for all artists.
+
+    Artist connectors only describe how their releases differ: how the model name is derived from the folder
+    name (`_gather_filename`), which of the images is the main one (`_select_main_images`) and whether unsupported
+    models are only taken from each subfolder of a model folder, relative to that subfolder
+    (`UNSUPPORTED_PER_SUBFOLDER`).
+    """
+
+    IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tiff"}
+    MODEL_EXTENSIONS_MAP = {
+        ".stl": "STL",
+        ".lys": "LYS",
+        ".chitubox": "CHITU",
+    }
+    UNSUPPORTED_PER_SUBFOLDER = False
+
+    def __init__(
+        self,
+        presupported_files_location: str = "Pre-Supported",
+    ) -> None:
+        self.presupported_files_location = presupported_files_location
+
+    def process_models(
+        self,
+        models_path: Path,
+        output_path: Path,
+        details_dict: dict[str, list[str]] | None = None,
+    ) -> None:
+        for model_folder, model_output_path in self.plan_models(models_path, output_path, details_dict):
+            self.process_single_model_folder(model_folder, model_output_path)
+
+    def plan_models(
+        self,
+        models_path: Path,
+        output_path: Path,
+        details_dict: dict[str, list[str]] | None = None,
+    ) -> list[tuple[Path, Path]]:
+        """Prepares the output folders and pairs every model folder with its output location.
+
+        Parameters
+        ----------
+        models_path : Path
+            Folder of the release with model folders inside.
+        output_path : Path
+            General output location.
+        details_dict : dict[str, list[str]] | None
+            Model types mapped to the model folder names of that type. Everything else is 'Characters'.
+
+        Returns
+        -------
+        list[tuple[Path, Path]]
+            Pairs of a model folder and the output location to pass to `process_single_model_folder`.
+
+        """
+        details_dict = self.normalize_details(details_dict)
+        reversed_details_dict = self.reverse_dict_with_list_values(details_dict)
+        self.prepare_folders(output_path, details_dict)
+
+        plan = []
+        for model_folder in self._iter_model_folders(models_path):
+            model_type = reversed_details_dict.get(model_folder.name, "Characters")
+            plan.append((model_folder, output_path / model_type))
+
+        return plan
+
+    def process_single_model_folder(
+        self,
+        model_folder_path: Path,
+        output_path: Path,
+        cancel_event: threading.Event | None = None,
+    ) -> None:
+        clean_model_name = self._gather_filename(model_folder_path)
+        image_location = self.detect_image_location(model_folder_path)
+        with StagedModelOutput(output_path, clean_model_name, cancel_event=cancel_event) as staged_output:
+            staged_output.journal.copy(
+                image_location,
+                staged_output.staging_path / f"{clean_model_name}{image_location.suffix}",
+            )
+            self._process_unsupported(
+                model_folder_path=model_folder_path,
+                general_output_location=staged_output.staging_path,
+                root_folders_ignore=[self.presupported_files_location],
+                image_absolute_location=image_location,
+                journal=staged_output.journal,
+            )
+
+            present_extensions = self._process_supported(
+                model_folder_path=model_folder_path,
+                general_output_location=staged_output.staging_path,
+                presupported_files_location=self.presupported_files_location,
+                image_absolute_location=image_location,
+                journal=staged_output.journal,
+            )
+        if len(present_extensions) == 0:
+            logger.warning(f"Did not find presupported files for file {model_folder_path}!")
+
+        else:
+            non_supported_file_tree = self.get_file_tree(output_path / "Unsupported" / clean_model_name / "Models")
+            n_non_supported_file_tree = len(non_supported_file_tree)
+            for extension in present_extensions:
+                supported_file_tree = self.get_file_tree(
+                    output_path / "Presupported" / clean_model_name / "Models" / self.MODEL_EXTENSIONS_MAP[extension],
+                )
+                n_supported_file_tree = len(supported_file_tree)
+
+                is_supported_equal_to_non_supported = n_non_supported_file_tree == n_supported_file_tree
+                if not is_supported_equal_to_non_supported:
+                    logger.warning(
+                        f"Found inconsistency in file {model_folder_path}: {n_non_supported_file_tree} in non-supported"
+                        f" vs {n_supported_file_tree} in {self.MODEL_EXTENSIONS_MAP[extension]}",
+                    )
+
+    @classmethod
+    def _process_unsupported(
+        cls,
+        model_folder_path: Path,
+        general_output_location: Path,
+        root_folders_ignore: Iterable[str] | None,
+        image_absolute_location: Path,
+        journal: CopyJournal | None = None,
+    ) -> None:
+        if root_folders_ignore is None:
+            root_folders_ignore = []
+
+        model_name = cls._gather_filename(model_folder_path)
+
+        output_model_location = general_output_location / "Unsupported" / model_name
+        output_model_location.mkdir(exist_ok=True)
+
+        output_model_files_location = output_model_location / "Models"
+        output_model_files_location.mkdir(exist_ok=True)
+
+        if cls.UNSUPPORTED_PER_SUBFOLDER:
+            search_folders = [
+                folder
+                for folder in model_folder_path.iterdir()
+                if folder.is_dir() and folder.name not in root_folders_ignore
+            ]
+            root_folders_ignore = []
+        else:
+            search_folders = [model_folder_path]
+
+        for search_folder in search_folders:
+            cls.extract_all_files_of_given_extension(
+                folder_path=search_folder,
+                extension=".stl",
+                output_path=output_model_files_location / cls.MODEL_EXTENSIONS_MAP[".stl"],
+                folders_to_remove=set(cls.MODEL_EXTENSIONS_MAP.values()),
+                root_folders_ignore=set(root_folders_ignore),
+                journal=journal,
+            )
+
+        copy_file = shutil.copy2 if journal is None else journal.copy
+        copy_file(image_absolute_location, output_model_location / (model_name + image_absolute_location.suffix))
+
+    @classmethod
+    def _process_supported(
+        cls,
+        model_folder_path: Path,
+        general_output_location: Path,
+        presupported_files_location: str = "Pre-Supported",
+        image_absolute_location: Path | None = None,
+        journal: CopyJournal | None = None,
+    ) -> list[str]:
+        model_name = cls._gather_filename(model_folder_path)
+        output_model_location = general_output_location / "Presupported" / model_name
+        output_model_location.mkdir(exist_ok=True)
+
+        output_model_files_location = output_model_location / "Models"
+        output_model_files_location.mkdir(exist_ok=True)
+
+        present_extensions = cls.extract_files_of_given_extensions(
+            folder_path=model_folder_path / presupported_files_location,
+            extensions_map={
+                model_extension: output_model_files_location / target_location
+                for model_extension, target_location in cls.MODEL_EXTENSIONS_MAP.items()
+            },
+            folders_to_remove=set(cls.MODEL_EXTENSIONS_MAP.values()),
+            journal=journal,
+        )
+
+        if image_absolute_location is None:
+            image_absolute_location = cls.detect_image_location(model_folder_path)
+        copy_file = shutil.copy2 if journal is None else journal.copy
+        copy_file(image_absolute_location, output_model_location / (model_name + image_absolute_location.suffix))
+
+        return present_extensions
+
+    @classmethod
+    def extract_all_files_of_given_extension(
+        cls,
+        folder_path: Path,
+        extension: str,
+        output_path: Path,
+        folders_to_remove: Collection[str],
+        root_folders_ignore: Collection[str] = (),
+        journal: CopyJournal | None = None,
+    ) -> bool:
+        present_extensions = cls.extract_files_of_given_extensions(
+            folder_path=folder_path,
+            extensions_map={extension: output_path},
+            folders_to_remove=folders_to_remove,
+            root_folders_ignore=root_folders_ignore,
+            journal=journal,
+        )
+        return len(present_extensions) > 0
+
+    @staticmethod
+    def extract_files_of_given_extensions(
+        folder_path: Path,
+        extensions_map: Mapping[str, Path],
+        folders_to_remove: Collection[str],
+        root_folders_ignore: Collection[str] = (),
+        journal: CopyJournal | None = None,
+    ) -> list[str]:
+        """Copies files of several extensions during a single walk over the folder.
+
+        Parameters
+        ----------
+        folder_path : Path
+            Folder to search in.
+        extensions_map : Mapping[str, Path]
+            Extensions to look for mapped to the folder where files of that extension are copied to.
+        folders_to_remove : Collection[str]
+            Folder names dropped from the relative path of a file when copying it.
+        root_folders_ignore : Collection[str]
+            Top-level folders of `folder_path` which are not searched.
+        journal : CopyJournal | None
+            Journal to copy through, so that copies finished by an interrupted run are skipped.
+
+        Returns
+        -------
+        list[str]
+            Extensions which had at least one file, in the order of `extensions_map`.
+
+        """
+        extensions_map = {
+            (extension if extension.startswith(".") else "." + extension): output_path
+            for extension, output_path in extensions_map.items()
+        }
+
+        copy_file = shutil.copy2 if journal is None else journal.copy
+        found_extensions = set()
+        created_folders = set()
+        for root, folder_names, file_names in os.walk(folder_path):
+            root_path = Path(root)
+            if root_path == folder_path:
+                # Ignored folders are pruned from the walk, so they are never listed.
+                folder_names[:] = [name for name in folder_names if name not in root_folders_ignore]
+
+            for file_name in file_names:
+                extension = next((e for e in extensions_map if file_name.endswith(e)), None)
+                if extension is None:
+                    continue
+
+                path = root_path / file_name
+                rel = path.relative_to(folder_path)
+                filtered = [p for p in rel.parts if p not in folders_to_remove]
+                target = extensions_map[extension] / Path(*filtered)
+                if target.parent not in created_folders:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    created_folders.add(target.parent)
+                copy_file(path, target)
+                found_extensions.add(extension)
+
+        return [extension for extension in extensions_map if extension in found_extensions]
+
+    @classmethod
+    def detect_image_location(cls, filepath: Path) -> Path:
+        logger.debug(f"Detecting images in {filepath}. List of directory: {list(filepath.iterdir())}")
+        images_list = [f for f in filepath.iterdir() if f.suffix.lower() in cls.IMAGE_EXTENSIONS and f.is_file()]
+        logger.debug(f"Found total {len(images_list)} images in {filepath}: {images_list}")
+
+        main_images = cls._select_main_images(images_list)
+
+        if len(main_images) > 1:
+            error_message = f"Found more than one image in {filepath}: {main_images}!"
+            raise MultipleImagesFoundException(error_message)
+        if len(main_images) == 0:
+            error_message = f"Failed to find an image in {filepath}!"
+            raise ImageNotFoundException(error_message)
+
+        return main_images[0]
+
+    @staticmethod
+    def _select_main_images(images_list: list[Path]) -> list[Path]:
+        return images_list
+
+    @classmethod
+    def model_name(cls, model_folder_path: Path) -> str:
+        return cls._gather_filename(model_folder_path)
+
+    @classmethod
+    @abstractmethod
+    def _gather_filename(
+        cls,
+        filepath: Path,
+    ) -> str:
+        pass
+
+    @staticmethod
+    def reverse_dict_with_list_values(d: dict) -> dict:
+        if d == {}:
+            return {}
+
+        result = {}
+        for key, value in d.items():
+            for item in value:
+                if item in result:
+                    existing_key = result[item]
+                    raise ValueError(
+                        f"Value duplication ({item}) detected when trying to reverse dict: {existing_key}, {key}!",
+                    )
+                result[item] = key
+
+        return result
+
+    @staticmethod
+    def prepare_folders(
+        output_path: Path,
+        details_dict: dict[str, list[str]],
+    ) -> None:
+        for key in details_dict:
+            (output_path / key / "Unsupported").mkdir(exist_ok=True, parents=True)
+            (output_path / key / "Presupported").mkdir(exist_ok=True, parents=True)
+
+        (output_path / "Characters" / "Unsupported").mkdir(exist_ok=True, parents=True)
+        (output_path / "Characters" / "Presupported").mkdir(exist_ok=True, parents=True)
+
+    @staticmethod
+    def normalize_details(
+        details_dict: dict[str, list[str]] | None = None,
+    ) -> dict[str, list[str]]:
+        details_dict_ = deepcopy(details_dict)
+        if details_dict_ is None:
+            details_dict_ = {}
+        if "Characters" in details_dict_:
+            logger.warning(f"Removing 'Characters' as redundant, dropped values: {details_dict_['Characters']}")
+            del details_dict_["Characters"]
+
+        return details_dict_
+
+    @classmethod
+    def _iter_model_folders(cls, root: Path) -> Iterable[Path]:
+        for child in root.iterdir():
+            if child.is_file():
+                logger.debug(f"Skipping file {child} as it is not a folder with model.")
+                continue
+            folder = child
+            folder = cls._flatten_same_name(folder)
+            yield folder
+
+    @staticmethod
+    def _flatten_same_name(model_folder: Path) -> Path:
+        model_name = model_folder.name
+        while True:
+            entries = [folder for folder in model_folder.iterdir() if folder.is_dir()]
+            if len(entries) != 1 or entries[0].name != model_name:
+                break
+
+            logger.debug(f"Going deeper to {model_folder / model_name}.")
+            model_folder = model_folder / model_name
+
+        return model_folder
+
+    @staticmethod
+    def get_file_tree(path: Path) -> list[Path]:
+        result = []
+        for p in path.rglob("*"):
+            if p.is_file():
+                result.append(p)
+
+        return result
@@ -8,3 +8,7 @@ class MultipleImagesFoundException(Exception):
 
 class ModelNameDetectionException(Exception):
     pass
+
+
+class ConnectorDetectionException(Exception):
+    pass
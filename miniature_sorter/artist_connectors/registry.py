@@ -0,0 +1,138 @@
+from collections.abc import Callable
+from dataclasses import dataclass
+import importlib
+from pathlib import Path
+import re
+from typing import Any
+
+from miniature_sorter import logger
+from miniature_sorter.artist_connectors.base_connector import BaseConnector
+from miniature_sorter.artist_connectors.exceptions import ConnectorDetectionException
+from miniature_sorter.artist_connectors.release_layout import ModelFolderLayout, ReleaseLayout, scan_release_layout
+
+
+CAST_N_PLAY_FOLDER_NAME = re.compile(r"^\d+(_|\. )")
+MIN_DETECTION_SCORE = 0.5
+
+
+@dataclass(frozen=True)
+class ConnectorSpec:
+    """Describes a connector without importing it.
+
+    `import_path` is ``"module:ClassName"``; the module is imported only in `load`. `detect` scores how well a
+    scanned release matches the artist, from 0 to 1, and must stay cheap and free of connector imports.
+    """
+
+    name: str
+    import_path: str
+    detect: Callable[[ReleaseLayout], float]
+
+    def load(self) -> type[BaseConnector]:
+        module_name, class_name = self.import_path.split(":")
+        return getattr(importlib.import_module(module_name), class_name)
+
+
+def _images(model_folder: ModelFolderLayout) -> list[str]:
+    return [name for name in model_folder.file_names if Path(name).suffix.lower() in BaseConnector.IMAGE_EXTENSIONS]
+
+
+def _share_of_model_folders(
+    layout: ReleaseLayout,
+    predicate: Callable[[ModelFolderLayout], bool],
+) -> float:
+    if len(layout.model_folders) == 0:
+        return 0.0
+
+    return sum(predicate(model_folder) for model_folder in layout.model_folders) / len(layout.model_folders)
+
+
+def detect_cast_n_play(layout: ReleaseLayout) -> float:
+    return _share_of_model_folders(
+        layout,
+        lambda model_folder: CAST_N_PLAY_FOLDER_NAME.match(model_folder.name) is not None
+        and len(_images(model_folder)) == 1,
+    )
+
+
+def detect_bite_the_bullet(layout: ReleaseLayout) -> float:
+    return _share_of_model_folders(
+        layout,
+        lambda model_folder: len([name for name in _images(model_folder) if name.startswith("_")]) == 1,
+    )
+
+
+CONNECTORS: dict[str, ConnectorSpec] = {}
+
+
+def register_connector(spec: ConnectorSpec) -> None:
+    if spec.name in CONNECTORS:
+        raise ValueError(f"Connector '{spec.name}' is already registered!")
+
+    CONNECTORS[spec.name] = spec
+
+
+register_connector(
+    ConnectorSpec(
+        name="cast_n_play",
+        import_path="miniature_sorter.artist_connectors.cast_n_play:CastNPlayConnector",
+        detect=detect_cast_n_play,
+    ),
+)
+register_connector(
+    ConnectorSpec(
+        name="bite_the_bullet",
+        import_path="miniature_sorter.artist_connectors.bite_the_bullet:BiteTheBulletConnector",
+        detect=detect_bite_the_bullet,
+    ),
+)
+
+
+def get_connector_class(name: str) -> type[BaseConnector]:
+    if name not in CONNECTORS:
+        raise ValueError(f"Unknown connector '{name}', available connectors: {sorted(CONNECTORS)}.")
+
+    return CONNECTORS[name].load()
+
+
+def detect_connector_name(release_path: Path) -> str:
+    """Recognizes the artist of a release from a single scan of its layout, shared by all connectors.
+
+    Parameters
+    ----------
+    release_path : Path
+        Folder of the release with model folders inside.
+
+    Returns
+    -------
+    str
+        Name of the registered connector that matches the release best.
+
+    """
+    layout = scan_release_layout(release_path)
+    scores = sorted(
+        ((spec.detect(layout), name) for name, spec in CONNECTORS.items()),
+        reverse=True,
+    )
+    logger.debug(f"Connector detection scores for {release_path}: {scores}")
+
+    best_score, best_name = scores[0]
+    if best_score < MIN_DETECTION_SCORE:
+        raise ConnectorDetectionException(f"No connector recognizes the release {release_path}: {scores}.")
+    if len(scores) > 1 and scores[1][0] == best_score:
+        raise ConnectorDetectionException(f"Several connectors match the release {release_path}: {scores}.")
+
+    logger.info(f"Detected connector '{best_name}' for {release_path}.")
+    return best_name
+
+
+def get_connector(
+    name: str | None = None,
+    release_path: Path | None = None,
+    **connector_kwargs: Any,
+) -> BaseConnector:
+    if name is None:
+        if release_path is None:
+            raise ValueError("Either a connector name or a release to detect it from is required!")
+        name = detect_connector_name(release_path)
+
+    return get_connector_class(name)(**connector_kwargs)
@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+import os
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class ModelFolderLayout:
+    name: str
+    file_names: tuple[str, ...]
+    folder_names: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ReleaseLayout:
+    release_path: Path
+    model_folders: tuple[ModelFolderLayout, ...]
+
+
+def _scan_entries(path: Path) -> tuple[tuple[str, ...], tuple[str, ...]]:
+    file_names = []
+    folder_names = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                folder_names.append(entry.name)
+            elif entry.is_file():
+                file_names.append(entry.name)
+
+    return tuple(sorted(file_names)), tuple(sorted(folder_names))
+
+
+def scan_release_layout(release_path: Path) -> ReleaseLayout:
+    """Scans the top two levels of a release. Detection shares one scan between all connectors.
+
+    Model folders wrapping a single folder of the same name are unwrapped, like the connectors do.
+
+    Parameters
+    ----------
+    release_path : Path
+        Folder of the release with model folders inside.
+
+    Returns
+    -------
+    ReleaseLayout
+        Names of the files and folders directly inside every model folder.
+
+    """
+    if not release_path.is_dir():
+        raise ValueError(f"Release folder {release_path} does not exist!")
+
+    _, model_folder_names = _scan_entries(release_path)
+    model_folders = []
+    for model_folder_name in model_folder_names:
+        model_folder_path = release_path / model_folder_name
+        file_names, folder_names = _scan_entries(model_folder_path)
+        while folder_names == (model_folder_name,):
+            model_folder_path = model_folder_path / model_folder_name
+            file_names, folder_names = _scan_entries(model_folder_path)
+
+        model_folders.append(ModelFolderLayout(model_folder_name, file_names, folder_names))
+
+    return ReleaseLayout(release_path, tuple(model_folders))
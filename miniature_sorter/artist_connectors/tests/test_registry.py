@@ -0,0 +1,139 @@
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+from miniature_sorter.artist_connectors import BaseConnector, detect_connector_name, get_connector
+from miniature_sorter.artist_connectors.exceptions import ConnectorDetectionException
+
+
+def build_release(
+    release_path: Path,
+    files: list[str],
+) -> None:
+    for file in files:
+        file_path = release_path / file
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(b"solid")
+
+
+def test_cast_n_play_detection():
+    with tempfile.TemporaryDirectory() as release_path:
+        release_path = Path(release_path)
+        build_release(
+            release_path,
+            [
+                "22. Mimic/Mimic_CastnPlay.png",
+                "22. Mimic/Pre-Supported/Mimic_Supported.stl",
+                "60_Ghosts/60_Ghosts/Ghosts.jpg",
+                "60_Ghosts/60_Ghosts/STL/Ghost_A.stl",
+            ],
+        )
+        assert detect_connector_name(release_path) == "cast_n_play"
+
+
+def test_bite_the_bullet_detection():
+    with tempfile.TemporaryDirectory() as release_path:
+        release_path = Path(release_path)
+        build_release(
+            release_path,
+            [
+                "Elf Rogue/_2512_ch_elf_rogue.jpg",
+                "Elf Rogue/2512_ch_elf_rogue_alt.jpg",
+                "Elf Rogue/STL/2512_ch_elf_rogue.stl",
+            ],
+        )
+        assert detect_connector_name(release_path) == "bite_the_bullet"
+
+
+def test_unknown_release_is_not_detected():
+    with tempfile.TemporaryDirectory() as release_path:
+        release_path = Path(release_path)
+        build_release(release_path, ["Elf Rogue/STL/2512_ch_elf_rogue.stl"])
+        with pytest.raises(ConnectorDetectionException):
+            detect_connector_name(release_path)
+
+
+def test_release_is_rescanned_after_changes():
+    with tempfile.TemporaryDirectory() as release_path:
+        release_path = Path(release_path)
+        build_release(release_path, ["Elf Rogue/STL/2512_ch_elf_rogue.stl"])
+        with pytest.raises(ConnectorDetectionException):
+            detect_connector_name(release_path)
+
+        build_release(release_path, ["Elf Rogue/_2512_ch_elf_rogue.jpg"])
+        assert detect_connector_name(release_path) == "bite_the_bullet"
+
+
+def test_cast_n_play_skips_root_files_and_presupported_folder():
+    with tempfile.TemporaryDirectory() as release_path:
+        with tempfile.TemporaryDirectory() as output_path:
+            release_path = Path(release_path)
+            output_path = Path(output_path)
+            build_release(
+                release_path,
+                [
+                    "22. Mimic/Mimic_CastnPlay.png",
+                    "22. Mimic/loose.stl",
+                    "22. Mimic/STL/Mimic.stl",
+                    "22. Mimic/Unsupported/Body/body.stl",
+                    "22. Mimic/Pre-Supported/STL/Mimic_Supported.stl",
+                ],
+            )
+
+            get_connector("cast_n_play").process_models(release_path, output_path)
+
+            unsupported_location = output_path / "Characters/Unsupported/22. Mimic/Models"
+            unsupported_files = sorted(
+                path.relative_to(unsupported_location).as_posix() for path in unsupported_location.rglob("*.stl")
+            )
+            # Paths are relative to each subfolder of the model folder, so the subfolder name is dropped.
+            assert unsupported_files == ["STL/Body/body.stl", "STL/Mimic.stl"]
+            assert (output_path / "Characters/Presupported/22. Mimic/Models/STL/Mimic_Supported.stl").exists()
+
+
+def test_bite_the_bullet_release_processing():
+    with tempfile.TemporaryDirectory() as release_path:
+        with tempfile.TemporaryDirectory() as output_path:
+            release_path = Path(release_path)
+            output_path = Path(output_path)
+            build_release(
+                release_path,
+                [
+                    "Elf Rogue/_2512_ch_elf_rogue.jpg",
+                    "Elf Rogue/STL/2512_ch_elf_rogue.stl",
+                    "Elf Rogue/Pre-Supported/LYS/2512_ch_elf_rogue.lys",
+                ],
+            )
+
+            get_connector(release_path=release_path).process_models(release_path, output_path)
+
+            file_structure = [
+                output_path / "Characters/Elf Rogue.jpg",
+                output_path / "Characters/Unsupported/Elf Rogue/Models/STL/2512_ch_elf_rogue.stl",
+                output_path / "Characters/Presupported/Elf Rogue/Models/LYS/2512_ch_elf_rogue.lys",
+            ]
+            for single_file in file_structure:
+                assert single_file.exists(), f"{single_file} not found!"
+
+
+def test_connectors_are_imported_lazily():
+    code = (
+        "import sys;"
+        "from miniature_sorter.artist_connectors import get_connector_class;"
+        "assert 'miniature_sorter.artist_connectors.cast_n_play' not in sys.modules;"
+        "get_connector_class('cast_n_play');"
+        "assert 'miniature_sorter.artist_connectors.cast_n_play' in sys.modules;"
+        "assert 'miniature_sorter.artist_connectors.bite_the_bullet' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_incomplete_connector_cannot_be_created():
+    class IncompleteConnector(BaseConnector):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteConnector()
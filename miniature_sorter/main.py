@@ -1,13 +1,14 @@
 from pathlib import Path
 
-from miniature_sorter.artist_connectors.cast_n_play import CastNPlayConnector
+from miniature_sorter.artist_connectors import get_connector
 from miniature_sorter.constants import PROJECT_ROOT
 
 
 def main():
-    connector = CastNPlayConnector()
-    connector.process_release(
-        Path("/home/f3ss1/Downloads/Beyond the Grave - November 2025"),
+    release_path = Path("/home/f3ss1/Downloads/Beyond the Grave - November 2025")
+    connector = get_connector(release_path=release_path)
+    connector.process_models(
+        release_path,
         PROJECT_ROOT / "result",
     )
 
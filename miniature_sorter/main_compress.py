@@ -1,9 +1,11 @@
+from miniature_sorter.archive_backends import get_archive_backend
 from miniature_sorter.rar_handler import RarHandler
 from miniature_sorter.constants import PROJECT_ROOT
 
 
 def main():
     general_output_location = PROJECT_ROOT / "rar_result"
+    backend = get_archive_backend("rar")
     paths = [
         PROJECT_ROOT / "result/Characters/Presupported",
         PROJECT_ROOT / "result/Characters/Unsupported",
@@ -11,7 +13,7 @@ def main():
     for path in paths:
         output_path = general_output_location / path.parent.name / path.name
         output_path.mkdir(parents=True, exist_ok=True)
-        RarHandler.compress_folders_in_folder(path, output_path)
+        RarHandler.compress_folders_in_folder(path, output_path, backend=backend)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+import argparse
+import json
+from pathlib import Path
+
+from miniature_sorter.archive_backends import ARCHIVE_BACKENDS
+from miniature_sorter.work_queue import SharedWorkQueue
+from miniature_sorter.work_queue.jobs import JOB_HANDLERS, enqueue_compression, enqueue_release
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Shared-directory work queue for sorting and compression.")
+    parser.add_argument("queue_root", type=Path, help="Queue folder on the filesystem shared by all hosts.")
+    parser.add_argument("--lease-seconds", type=float, default=600.0)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    submit_release = subparsers.add_parser("submit-release", help="Queue every model folder of a release.")
+    submit_release.add_argument("models_path", type=Path)
+    submit_release.add_argument("output_path", type=Path)
+    submit_release.add_argument(
+        "--connector",
+        default=None,
+        help="Name of the artist connector, detected from the release layout when omitted.",
+    )
+    submit_release.add_argument(
+        "--details",
+        type=Path,
+        default=None,
+        help="JSON file mapping model types to lists of model folder names.",
+    )
+
+    submit_compress = subparsers.add_parser("submit-compress", help="Queue every folder inside a folder for archiving.")
+    submit_compress.add_argument("folder_path", type=Path)
+    submit_compress.add_argument("output_path", type=Path)
+    submit_compress.add_argument("--backend", choices=sorted(ARCHIVE_BACKENDS), default="rar")
+
+    work = subparsers.add_parser("work", help="Process jobs until the queue is drained.")
+    work.add_argument("--poll-interval", type=float, default=5.0)
+    work.add_argument("--keep-polling", action="store_true", help="Do not exit when the queue is empty.")
+
+    subparsers.add_parser("summary", help="Merge results of all workers into summary.json.")
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    queue = SharedWorkQueue(args.queue_root, lease_seconds=args.lease_seconds)
+
+    if args.command == "submit-release":
+        details_dict = None
+        if args.details is not None:
+            details_dict = json.loads(args.details.read_text(encoding="utf-8"))
+        enqueue_release(queue, args.models_path, args.output_path, details_dict, connector_name=args.connector)
+    elif args.command == "submit-compress":
+        enqueue_compression(queue, args.folder_path, args.output_path, backend_name=args.backend)
+    elif args.command == "work":
+        queue.run_worker(JOB_HANDLERS, poll_interval=args.poll_interval, stop_when_empty=not args.keep_polling)
+        queue.write_summary()
+    elif args.command == "summary":
+        queue.write_summary()
+
+
+if __name__ == "__main__":
+    main()
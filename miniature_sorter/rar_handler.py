@@ -1,9 +1,9 @@
-import subprocess
 from pathlib import Path
 
 from tqdm import tqdm
 
 from miniature_sorter import logger
+from miniature_sorter.archive_backends import ArchiveBackend, RarBackend
 
 
 class RarHandler:
@@ -15,9 +15,12 @@ class RarHandler:
         cls,
         folder_path: Path,
         output_folder_path: Path,
+        backend: ArchiveBackend | None = None,
     ) -> None:
         if not folder_path.is_dir():
             raise ValueError("Source folder does not exist!")
+        if backend is None:
+            backend = RarBackend()
 
         total_processed = 0
         ignored = []
@@ -29,9 +32,14 @@ class RarHandler:
                 continue
 
             try:
-                cls.compress_single_folder(folder_path / entity, output_folder_path / (entity.name + ".rar"))
+                cls.compress_single_folder(
+                    folder_path / entity,
+                    output_folder_path / (entity.name + backend.extension),
+                    backend=backend,
+                )
                 total_processed += 1
             except Exception:
+                logger.exception(f"Failed to compress {entity} with {backend.name} backend.")
                 exceptions.append(entity)
 
         if total_processed == 0:
@@ -45,31 +53,12 @@ class RarHandler:
     def compress_single_folder(
         folder_path: Path,
         output_path: Path,
+        backend: ArchiveBackend | None = None,
     ) -> None:
 
         if not folder_path.is_dir():
             raise ValueError("Source folder does not exist!")
+        if backend is None:
+            backend = RarBackend()
 
-        # remove existing archive if needed
-        if output_path.exists():
-            output_path.unlink()
-
-        cmd = [
-            "rar",
-            "a",
-            str(output_path),
-            folder_path.name,
-        ]
-
-        # run inside the parent to avoid absolute paths inside archive
-        proc = subprocess.run(
-            cmd,
-            cwd=folder_path.parent,
-            check=False,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
-
-        if proc.returncode != 0:
-            raise RuntimeError(proc.stderr)
+        backend.compress_folder(folder_path, output_path)
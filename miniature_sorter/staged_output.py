@@ -0,0 +1,218 @@
+import json
+import os
+from pathlib import Path
+import shutil
+import threading
+from types import TracebackType
+from typing import Self
+
+from miniature_sorter import logger
+
+
+class StagingCancelledException(Exception):
+    pass
+
+
+class CopyJournal:
+    """Write-ahead journal of finished file copies inside a staging folder.
+
+    A copy goes to a ``.partial`` file which is synced and renamed into place, and only then the copy is
+    appended to the journal and synced, so the journal survives host crashes and power loss as well. On the next
+    run, copies recorded in the journal whose source did not change and whose target is still there are skipped,
+    so an interrupted model resumes from the last finished file. Targets passed to `copy` during the current run
+    are kept in `visited`.
+    """
+
+    PARTIAL_SUFFIX = ".partial"
+
+    def __init__(
+        self,
+        journal_path: Path,
+        cancel_event: threading.Event | None = None,
+    ) -> None:
+        self.journal_path = journal_path
+        self.root = journal_path.parent
+        self.cancel_event = cancel_event
+        self.entries: dict[str, dict[str, int]] = {}
+        self.visited: set[str] = set()
+        if journal_path.exists():
+            self.entries = self._load(journal_path)
+        self._journal_file = journal_path.open("a", encoding="utf-8")
+
+    def copy(
+        self,
+        src: Path,
+        dst: Path,
+    ) -> None:
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise StagingCancelledException(f"Copying into {self.root} was cancelled.")
+
+        key = dst.relative_to(self.root).as_posix()
+        self.visited.add(key)
+        src_stat = src.stat()
+        if self._is_done(key, src_stat, dst):
+            return
+
+        partial_path = dst.with_name(dst.name + self.PARTIAL_SUFFIX)
+        shutil.copy2(src, partial_path)
+        # The data and the rename must reach the disk before the journal claims the copy is done.
+        with partial_path.open("rb") as f:
+            os.fsync(f.fileno())
+        partial_path.replace(dst)
+        self._fsync_directory(dst.parent)
+
+        entry = {"size": src_stat.st_size, "mtime_ns": src_stat.st_mtime_ns}
+        self._journal_file.write(json.dumps({"dst": key, **entry}) + "\n")
+        self._journal_file.flush()
+        os.fsync(self._journal_file.fileno())
+        self.entries[key] = entry
+
+    def close(self) -> None:
+        self._journal_file.close()
+
+    def _is_done(
+        self,
+        key: str,
+        src_stat: os.stat_result,
+        dst: Path,
+    ) -> bool:
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        if entry["size"] != src_stat.st_size or entry["mtime_ns"] != src_stat.st_mtime_ns:
+            return False
+
+        try:
+            return dst.stat().st_size == entry["size"]
+        except FileNotFoundError:
+            return False
+
+    @staticmethod
+    def _fsync_directory(path: Path) -> None:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _load(journal_path: Path) -> dict[str, dict[str, int]]:
+        entries = {}
+        with journal_path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be torn by a crash while it was written.
+                    logger.warning(f"Ignoring a damaged line in journal {journal_path}.")
+                    continue
+                entries[record.pop("dst")] = record
+
+        return entries
+
+
+class StagedModelOutput:
+    """Builds the output of a single model in a staging folder and moves it into place only once complete.
+
+    The staging folder lives next to the final output, so moving it into place is a rename on the same
+    filesystem. Its layout mirrors the output folder: ``Unsupported/<model>``, ``Presupported/<model>`` and
+    top-level files. If building fails, the staging folder and its journal are kept, and the next run for the
+    same model resumes from them. Before the commit, staged files which the current run did not copy, such as
+    orphaned ``.partial`` files or copies of sources removed since an earlier run, are deleted. Output left by
+    earlier runs is replaced instead of merged into. Once
+    `cancel_event` is set, further copies raise `StagingCancelledException` and nothing is committed.
+
+    Each part of the model is renamed into place atomically, but the commit as a whole is a series of renames:
+    ``Unsupported``, then ``Presupported``, then the top-level files. A crash in between leaves the output with
+    a mix of new and old parts of the model. Parts which were not moved yet stay in the staging folder, and the
+    next run for the model rebuilds and commits the whole model again, which repairs the output.
+    """
+
+    STAGING_FOLDER = ".staging"
+    JOURNAL_NAME = "journal.jsonl"
+    PARTS = ("Unsupported", "Presupported")
+
+    def __init__(
+        self,
+        output_path: Path,
+        model_name: str,
+        cancel_event: threading.Event | None = None,
+    ) -> None:
+        self.output_path = output_path
+        self.model_name = model_name
+        self.cancel_event = cancel_event
+        self.staging_path = output_path / self.STAGING_FOLDER / model_name
+        self.journal: CopyJournal | None = None
+
+    def __enter__(self) -> Self:
+        for part in self.PARTS:
+            (self.staging_path / part).mkdir(parents=True, exist_ok=True)
+
+        self.journal = CopyJournal(self.staging_path / self.JOURNAL_NAME, cancel_event=self.cancel_event)
+        if len(self.journal.entries) > 0:
+            logger.info(
+                f"Resuming {self.model_name} from {len(self.journal.entries)} files copied by an earlier run.",
+            )
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.journal.close()
+        if exc_type is None:
+            self.commit()
+        else:
+            logger.warning(f"Keeping staged output of {self.model_name} in {self.staging_path} to resume later.")
+
+    def commit(self) -> None:
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise StagingCancelledException(f"Commit of {self.model_name} was cancelled.")
+
+        self._remove_unvisited()
+        for part in self.PARTS:
+            self._commit_part(part)
+
+        for staged_file in self.staging_path.iterdir():
+            if staged_file.name == self.JOURNAL_NAME:
+                continue
+            if staged_file.is_file():
+                staged_file.replace(self.output_path / staged_file.name)
+
+        shutil.rmtree(self.staging_path)
+        try:
+            self.staging_path.parent.rmdir()
+        except OSError:
+            # Other models are still staged.
+            pass
+
+    def _commit_part(self, part: str) -> None:
+        staged_path = self.staging_path / part / self.model_name
+        if not staged_path.exists():
+            return
+
+        final_path = self.output_path / part / self.model_name
+        if final_path.exists():
+            logger.warning(f"Replacing output of an earlier run in {final_path}.")
+            replaced_path = self.staging_path / f"{part}.replaced"
+            if replaced_path.exists():
+                shutil.rmtree(replaced_path)
+            final_path.rename(replaced_path)
+        final_path.parent.mkdir(parents=True, exist_ok=True)
+        staged_path.rename(final_path)
+
+    def _remove_unvisited(self) -> None:
+        for root, _, file_names in os.walk(self.staging_path, topdown=False):
+            root_path = Path(root)
+            for file_name in file_names:
+                staged_file = root_path / file_name
+                key = staged_file.relative_to(self.staging_path).as_posix()
+                if key == self.JOURNAL_NAME or key in self.journal.visited:
+                    continue
+                logger.debug(f"Removing {staged_file} as it was not copied by the current run.")
+                staged_file.unlink()
+
+            if root_path != self.staging_path and not any(root_path.iterdir()):
+                root_path.rmdir()
@@ -0,0 +1,149 @@
+from pathlib import Path
+import tempfile
+
+import pytest
+
+from miniature_sorter.artist_connectors.bite_the_bullet import BiteTheBulletConnector
+from miniature_sorter.staged_output import StagedModelOutput
+
+
+def test_interrupted_model_is_resumed():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        source = temp_dir / "source"
+        source.mkdir()
+        for name in ("a.stl", "b.stl"):
+            (source / name).write_bytes(b"solid " + name.encode())
+        output_path = temp_dir / "output"
+
+        with pytest.raises(KeyboardInterrupt), StagedModelOutput(output_path, "Mimic") as staged_output:
+            (staged_output.staging_path / "Unsupported/Mimic").mkdir()
+            staged_output.journal.copy(source / "a.stl", staged_output.staging_path / "Unsupported/Mimic/a.stl")
+            raise KeyboardInterrupt
+
+        assert not (output_path / "Unsupported/Mimic").exists()
+        staged_copy = output_path / StagedModelOutput.STAGING_FOLDER / "Mimic/Unsupported/Mimic/a.stl"
+        staged_copy.write_bytes(b"XXXXXXXXXXX")  # Same size, different content: proves the copy is skipped.
+
+        with StagedModelOutput(output_path, "Mimic") as staged_output:
+            assert len(staged_output.journal.entries) == 1
+            for name in ("a.stl", "b.stl"):
+                staged_output.journal.copy(source / name, staged_output.staging_path / "Unsupported/Mimic" / name)
+
+        assert (output_path / "Unsupported/Mimic/a.stl").read_bytes() == b"XXXXXXXXXXX"
+        assert (output_path / "Unsupported/Mimic/b.stl").read_bytes() == b"solid b.stl"
+        assert not (output_path / StagedModelOutput.STAGING_FOLDER).exists()
+
+
+def test_leftovers_are_replaced():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        source = temp_dir / "source.stl"
+        source.write_bytes(b"solid")
+        output_path = temp_dir / "output"
+        leftover = output_path / "Presupported/Mimic/Models/STL/old.stl"
+        leftover.parent.mkdir(parents=True)
+        leftover.write_bytes(b"solid")
+
+        with StagedModelOutput(output_path, "Mimic") as staged_output:
+            (staged_output.staging_path / "Presupported/Mimic").mkdir()
+            staged_output.journal.copy(source, staged_output.staging_path / "Presupported/Mimic/new.stl")
+            staged_output.journal.copy(source, staged_output.staging_path / "Mimic.stl")
+
+        assert not leftover.exists()
+        assert (output_path / "Presupported/Mimic/new.stl").exists()
+        assert (output_path / "Mimic.stl").exists()
+
+
+def test_interrupted_commit_is_repaired(monkeypatch: pytest.MonkeyPatch):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        source = temp_dir / "source.stl"
+        source.write_bytes(b"solid new")
+        output_path = temp_dir / "output"
+        for part in StagedModelOutput.PARTS:
+            leftover = output_path / part / "Mimic/old.stl"
+            leftover.parent.mkdir(parents=True)
+            leftover.write_bytes(b"solid old")
+
+        def build_model() -> None:
+            with StagedModelOutput(output_path, "Mimic") as staged_output:
+                for part in StagedModelOutput.PARTS:
+                    (staged_output.staging_path / part / "Mimic").mkdir(exist_ok=True)
+                    staged_output.journal.copy(source, staged_output.staging_path / part / "Mimic/new.stl")
+
+        commit_part = StagedModelOutput._commit_part
+
+        def crash_before_presupported(self: StagedModelOutput, part: str) -> None:
+            if part == "Presupported":
+                raise KeyboardInterrupt
+            commit_part(self, part)
+
+        monkeypatch.setattr(StagedModelOutput, "_commit_part", crash_before_presupported)
+        with pytest.raises(KeyboardInterrupt):
+            build_model()
+        assert (output_path / "Unsupported/Mimic/new.stl").exists()
+        assert (output_path / "Presupported/Mimic/old.stl").exists()
+
+        monkeypatch.setattr(StagedModelOutput, "_commit_part", commit_part)
+        build_model()
+
+        for part in StagedModelOutput.PARTS:
+            assert sorted(path.name for path in (output_path / part / "Mimic").iterdir()) == ["new.stl"]
+        assert not (output_path / StagedModelOutput.STAGING_FOLDER).exists()
+
+
+def test_interrupted_connector_model_is_resumed(monkeypatch: pytest.MonkeyPatch):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        model_folder = temp_dir / "release/Elf Rogue"
+        for name in ("_2512_ch_elf_rogue.jpg", "STL/2512_ch_elf_rogue.stl", "Pre-Supported/STL/2512_ch_elf_rogue.stl"):
+            (model_folder / name).parent.mkdir(parents=True, exist_ok=True)
+            (model_folder / name).write_bytes(b"solid elf")
+        output_path = temp_dir / "output/Characters"
+        connector = BiteTheBulletConnector()
+        connector.prepare_folders(output_path.parent, {})
+
+        def crash(*args, **kwargs) -> None:
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(BiteTheBulletConnector, "_process_supported", crash)
+        with pytest.raises(KeyboardInterrupt):
+            connector.process_single_model_folder(model_folder, output_path)
+        monkeypatch.undo()
+
+        assert not (output_path / "Unsupported/Elf Rogue").exists()
+        staged_copy = output_path / StagedModelOutput.STAGING_FOLDER / "Elf Rogue/Unsupported/Elf Rogue/Models/STL"
+        (staged_copy / "2512_ch_elf_rogue.stl").write_bytes(b"XXXXXXXXX")
+
+        connector.process_single_model_folder(model_folder, output_path)
+
+        unsupported_copy = output_path / "Unsupported/Elf Rogue/Models/STL/2512_ch_elf_rogue.stl"
+        assert unsupported_copy.read_bytes() == b"XXXXXXXXX"
+        assert (output_path / "Presupported/Elf Rogue/Models/STL/2512_ch_elf_rogue.stl").exists()
+        assert (output_path / "Elf Rogue.jpg").exists()
+        assert not (output_path / StagedModelOutput.STAGING_FOLDER).exists()
+
+
+def test_files_not_copied_by_current_run_are_not_committed():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        source = temp_dir / "source"
+        source.mkdir()
+        for name in ("kept.stl", "removed.stl"):
+            (source / name).write_bytes(b"solid " + name.encode())
+        output_path = temp_dir / "output"
+
+        with pytest.raises(KeyboardInterrupt), StagedModelOutput(output_path, "Mimic") as staged_output:
+            model_location = staged_output.staging_path / "Unsupported/Mimic"
+            (model_location / "Removed").mkdir(parents=True)
+            staged_output.journal.copy(source / "kept.stl", model_location / "kept.stl")
+            staged_output.journal.copy(source / "removed.stl", model_location / "Removed/removed.stl")
+            (model_location / "orphan.stl.partial").write_bytes(b"sol")
+            raise KeyboardInterrupt
+
+        (source / "removed.stl").unlink()
+        with StagedModelOutput(output_path, "Mimic") as staged_output:
+            staged_output.journal.copy(source / "kept.stl", staged_output.staging_path / "Unsupported/Mimic/kept.stl")
+
+        assert sorted(path.name for path in (output_path / "Unsupported/Mimic").iterdir()) == ["kept.stl"]
@@ -0,0 +1 @@
+from .shared_work_queue import ClaimedJob, SharedWorkQueue
@@ -0,0 +1,103 @@
+from pathlib import Path
+import threading
+from typing import Any
+
+from miniature_sorter.artist_connectors import detect_connector_name, get_connector
+from miniature_sorter.archive_backends import get_archive_backend
+from miniature_sorter.rar_handler import RarHandler
+from miniature_sorter.work_queue.shared_work_queue import SharedWorkQueue
+
+
+SORT_MODEL_JOB = "sort_model"
+COMPRESS_FOLDER_JOB = "compress_folder"
+
+
+def enqueue_release(
+    queue: SharedWorkQueue,
+    models_path: Path,
+    output_path: Path,
+    details_dict: dict[str, list[str]] | None = None,
+    presupported_files_location: str = "Pre-Supported",
+    connector_name: str | None = None,
+) -> list[str]:
+    if connector_name is None:
+        connector_name = detect_connector_name(models_path)
+    connector = get_connector(connector_name, presupported_files_location=presupported_files_location)
+    return [
+        queue.submit(
+            SORT_MODEL_JOB,
+            {
+                "connector": connector_name,
+                "model_folder": str(model_folder),
+                "output_path": str(model_output_path),
+                "presupported_files_location": presupported_files_location,
+            },
+        )
+        for model_folder, model_output_path in connector.plan_models(models_path, output_path, details_dict)
+    ]
+
+
+def enqueue_compression(
+    queue: SharedWorkQueue,
+    folder_path: Path,
+    output_folder_path: Path,
+    backend_name: str = "rar",
+) -> list[str]:
+    if not folder_path.is_dir():
+        raise ValueError("Source folder does not exist!")
+
+    extension = get_archive_backend(backend_name).extension
+    output_folder_path.mkdir(parents=True, exist_ok=True)
+    return [
+        queue.submit(
+            COMPRESS_FOLDER_JOB,
+            {
+                "backend": backend_name,
+                "folder_path": str(entity),
+                "output_path": str(output_folder_path / (entity.name + extension)),
+            },
+        )
+        for entity in sorted(folder_path.iterdir())
+        if entity.is_dir()
+    ]
+
+
+def sort_model(
+    payload: dict[str, Any],
+    lease_lost: threading.Event,
+) -> dict[str, Any]:
+    model_folder = Path(payload["model_folder"])
+    connector = get_connector(
+        payload["connector"],
+        presupported_files_location=payload["presupported_files_location"],
+    )
+    # Stops copying into the shared staging folder and skips the commit once another worker owns the model.
+    connector.process_single_model_folder(model_folder, Path(payload["output_path"]), cancel_event=lease_lost)
+    return {"model_folder": str(model_folder), "model_name": connector.model_name(model_folder)}
+
+
+def compress_folder(
+    payload: dict[str, Any],
+    lease_lost: threading.Event,
+) -> dict[str, Any]:
+    """Archives a single folder.
+
+    Archive backends cannot be interrupted, so a worker that loses its lease mid-way still finishes the archive
+    concurrently with the worker that reclaimed the job. Each writes its own temporary archive and the last one
+    to finish replaces the output. Only the job outcome of the first worker is dropped.
+    """
+    output_path = Path(payload["output_path"])
+    if lease_lost.is_set():
+        raise RuntimeError(f"Lease for {output_path} was lost before compression started.")
+    RarHandler.compress_single_folder(
+        Path(payload["folder_path"]),
+        output_path,
+        backend=get_archive_backend(payload["backend"]),
+    )
+    return {"archive": str(output_path), "size": output_path.stat().st_size}
+
+
+JOB_HANDLERS = {
+    SORT_MODEL_JOB: sort_model,
+    COMPRESS_FOLDER_JOB: compress_folder,
+}
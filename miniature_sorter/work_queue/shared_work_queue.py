@@ -0,0 +1,396 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+from pathlib import Path
+import socket
+import threading
+import time
+from typing import Any
+import uuid
+
+from miniature_sorter import logger
+
+
+@dataclass
+class ClaimedJob:
+    job_id: str
+    kind: str
+    payload: dict[str, Any]
+    attempts: int
+    path: Path
+
+
+class SharedWorkQueue:
+    """Work queue living in a directory on a filesystem shared by several hosts.
+
+    Every job is a JSON file that moves between ``pending``, ``claimed``, ``done`` and ``failed`` subfolders.
+    Claiming relies on ``os.rename`` being atomic, so only one worker can win a job. A claimed job is leased:
+    the owning worker keeps touching the claimed file and any worker may put it back to ``pending`` once
+    its modification time is older than ``lease_seconds``.
+    """
+
+    PENDING = "pending"
+    CLAIMED = "claimed"
+    DONE = "done"
+    FAILED = "failed"
+    TMP = "tmp"
+    WORKER_SEPARATOR = "@"
+
+    def __init__(
+        self,
+        queue_root: Path,
+        lease_seconds: float = 600.0,
+        max_attempts: int = 3,
+        worker_id: str | None = None,
+    ) -> None:
+        if lease_seconds <= 0:
+            raise ValueError("Lease duration must be positive!")
+        if max_attempts < 1:
+            raise ValueError("At least one attempt per job is required!")
+
+        self.queue_root = queue_root
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        if self.WORKER_SEPARATOR in self.worker_id:
+            raise ValueError(f"Worker id must not contain '{self.WORKER_SEPARATOR}': {self.worker_id}")
+
+        for state in (self.PENDING, self.CLAIMED, self.DONE, self.FAILED, self.TMP):
+            (self.queue_root / state).mkdir(parents=True, exist_ok=True)
+
+    def submit(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+    ) -> str:
+        """Adds a job to the queue, unless the very same job was already submitted.
+
+        Parameters
+        ----------
+        kind : str
+            Name of the handler that should process the job.
+        payload : dict[str, Any]
+            JSON-serializable job arguments. Paths must be valid on every host.
+
+        Returns
+        -------
+        str
+            The job id, derived from kind and payload.
+
+        """
+        job_id = self.make_job_id(kind, payload)
+        if self._find_job(job_id) is not None:
+            logger.debug(f"Job {job_id} ({kind}) is already known to the queue, skipping.")
+            return job_id
+
+        job = {"job_id": job_id, "kind": kind, "payload": payload, "attempts": 0}
+        self._write_json_atomically(self.queue_root / self.PENDING / f"{job_id}.json", job)
+        return job_id
+
+    def claim(self) -> ClaimedJob | None:
+        """Claims the first pending job.
+
+        The job is first renamed into ``tmp``, its attempts are updated there, and only then it is renamed into
+        ``claimed``. A worker reclaiming it in between therefore cannot leave the job both pending and claimed.
+        Its modification time is refreshed before it leaves ``pending``, so a job that waited for longer than the
+        lease does not look expired once claimed.
+
+        Returns
+        -------
+        ClaimedJob | None
+            The claimed job, or None when there is nothing to claim.
+
+        """
+        for pending_path in sorted((self.queue_root / self.PENDING).glob("*.json")):
+            job_id = pending_path.stem
+            claim_name = f"{job_id}{self.WORKER_SEPARATOR}{self.worker_id}.json"
+            claiming_path = self.queue_root / self.TMP / claim_name
+            try:
+                # Renames keep the modification time, so the claim must not inherit the age of the pending file.
+                os.utime(pending_path)
+                pending_path.rename(claiming_path)
+            except FileNotFoundError:
+                # Another worker was faster.
+                continue
+
+            job = self._read_json(claiming_path)
+            job["attempts"] += 1
+            self._write_json_atomically(claiming_path, job)
+            claimed_path = self.queue_root / self.CLAIMED / claim_name
+            claiming_path.rename(claimed_path)
+
+            logger.info(f"Worker {self.worker_id} claimed job {job_id} ({job['kind']}), attempt {job['attempts']}.")
+            return ClaimedJob(
+                job_id=job_id,
+                kind=job["kind"],
+                payload=job["payload"],
+                attempts=job["attempts"],
+                path=claimed_path,
+            )
+
+        return None
+
+    def heartbeat(self, job: ClaimedJob) -> bool:
+        try:
+            os.utime(job.path)
+        except FileNotFoundError:
+            logger.warning(f"Lease for job {job.job_id} was lost by worker {self.worker_id}.")
+            return False
+
+        return True
+
+    def complete(
+        self,
+        job: ClaimedJob,
+        result: dict[str, Any] | None = None,
+    ) -> bool:
+        done_path = self.queue_root / self.DONE / f"{job.job_id}.json"
+        if not self._release(job, done_path):
+            return False
+
+        record = self._read_json(done_path)
+        record.update({"worker_id": self.worker_id, "finished_at": time.time(), "result": result or {}})
+        self._write_json_atomically(done_path, record)
+        return True
+
+    def fail(
+        self,
+        job: ClaimedJob,
+        error: str,
+    ) -> bool:
+        if job.attempts < self.max_attempts:
+            logger.warning(f"Job {job.job_id} failed on attempt {job.attempts}, returning it to the queue: {error}")
+            return self._release(job, self.queue_root / self.PENDING / f"{job.job_id}.json")
+
+        logger.error(f"Job {job.job_id} failed {job.attempts} times, giving up: {error}")
+        failed_path = self.queue_root / self.FAILED / f"{job.job_id}.json"
+        if not self._release(job, failed_path):
+            return False
+
+        record = self._read_json(failed_path)
+        record.update({"worker_id": self.worker_id, "finished_at": time.time(), "error": error})
+        self._write_json_atomically(failed_path, record)
+        return True
+
+    def reclaim_expired(self) -> int:
+        """Returns jobs whose lease has expired back to ``pending``.
+
+        Claims still in ``tmp`` belong to a worker in the middle of `claim` and are never reclaimed, since
+        the claiming worker may still be rewriting them. One that stays there for longer than the lease was left
+        by a worker that crashed while claiming, and is only reported. The current time is taken from the shared
+        filesystem, see `_filesystem_now`.
+
+        Returns
+        -------
+        int
+            Number of reclaimed jobs.
+
+        """
+        now = self._filesystem_now()
+        reclaimed = 0
+        for claimed_path in (self.queue_root / self.CLAIMED).glob("*.json"):
+            try:
+                expired = now - claimed_path.stat().st_mtime > self.lease_seconds
+                if not expired:
+                    continue
+                job_id = claimed_path.stem.split(self.WORKER_SEPARATOR, 1)[0]
+                claimed_path.rename(self.queue_root / self.PENDING / f"{job_id}.json")
+            except FileNotFoundError:
+                # Completed, renewed or reclaimed by someone else in the meantime.
+                continue
+
+            logger.warning(f"Reclaimed expired job {job_id} from {claimed_path.name}.")
+            reclaimed += 1
+
+        for claiming_path in (self.queue_root / self.TMP).glob(f"*{self.WORKER_SEPARATOR}*.json"):
+            try:
+                abandoned = now - claiming_path.stat().st_mtime > self.lease_seconds
+            except FileNotFoundError:
+                continue
+            if abandoned:
+                logger.error(
+                    f"Claim {claiming_path} was abandoned by a crashed worker, move it to "
+                    f"{self.queue_root / self.PENDING} by hand once that worker is surely gone.",
+                )
+
+        return reclaimed
+
+    def count(self, state: str) -> int:
+        return sum(1 for _ in (self.queue_root / state).glob("*.json"))
+
+    def summarize(self) -> dict[str, Any]:
+        """Merges the results of all finished jobs, no matter which host processed them."""
+        summary: dict[str, Any] = {
+            state: self.count(state) for state in (self.PENDING, self.CLAIMED, self.DONE, self.FAILED)
+        }
+        per_kind: dict[str, dict[str, Any]] = {}
+        for done_path in sorted((self.queue_root / self.DONE).glob("*.json")):
+            record = self._read_json(done_path)
+            kind_summary = per_kind.setdefault(record["kind"], {"done": 0, "results": []})
+            kind_summary["done"] += 1
+            kind_summary["results"].append(record.get("result", {}))
+
+        summary["per_kind"] = per_kind
+        summary["failures"] = [
+            {
+                "job_id": record["job_id"],
+                "kind": record["kind"],
+                "payload": record["payload"],
+                "error": record.get("error"),
+            }
+            for record in map(self._read_json, sorted((self.queue_root / self.FAILED).glob("*.json")))
+        ]
+        return summary
+
+    def write_summary(self, output_path: Path | None = None) -> Path:
+        if output_path is None:
+            output_path = self.queue_root / "summary.json"
+
+        self._write_json_atomically(output_path, self.summarize())
+        return output_path
+
+    def run_worker(
+        self,
+        handlers: dict[str, Callable[[dict[str, Any], threading.Event], dict[str, Any] | None]],
+        poll_interval: float = 5.0,
+        stop_when_empty: bool = True,
+    ) -> int:
+        """Processes jobs until the queue is drained.
+
+        A worker that fails to renew its lease in time (e.g. the shared filesystem stalled for longer than
+        `lease_seconds`) may have its job reclaimed by another worker while its handler is still running. The
+        handler is not killed: it receives an event which is set once the lease is lost, and should stop writing
+        and avoid committing its output when it sees it. Until the handler notices, both workers may run the
+        same job at once, for at most a third of the lease, so handlers must tolerate a duplicate run.
+
+        Parameters
+        ----------
+        handlers : dict[str, Callable[[dict[str, Any], threading.Event], dict[str, Any] | None]]
+            Maps a job kind to a callable receiving the payload and the lease-lost event, and returning
+            a JSON-serializable result.
+        poll_interval : float
+            Seconds to wait when there is nothing to claim.
+        stop_when_empty : bool
+            Whether to return once there are no pending jobs and no leases held by other workers.
+
+        Returns
+        -------
+        int
+            Number of jobs completed by this worker.
+
+        """
+        completed = 0
+        while True:
+            self.reclaim_expired()
+            job = self.claim()
+            if job is None:
+                if stop_when_empty and self.count(self.PENDING) == 0 and self.count(self.CLAIMED) == 0:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            handler = handlers.get(job.kind)
+            if handler is None:
+                self.fail(job, f"No handler registered for job kind '{job.kind}'.")
+                continue
+
+            with self._keep_lease(job) as lease_lost:
+                try:
+                    result = handler(job.payload, lease_lost)
+                except Exception as e:
+                    if lease_lost.is_set():
+                        logger.warning(f"Job {job.job_id} ({job.kind}) was stopped after its lease was lost: {e!r}")
+                        continue
+                    logger.exception(f"Job {job.job_id} ({job.kind}) raised an exception.")
+                    self.fail(job, repr(e))
+                    continue
+
+            if self.complete(job, result):
+                completed += 1
+
+        logger.info(f"Worker {self.worker_id} finished, completed {completed} jobs.")
+        return completed
+
+    @staticmethod
+    def make_job_id(
+        kind: str,
+        payload: dict[str, Any],
+    ) -> str:
+        serialized = json.dumps({"kind": kind, "payload": payload}, sort_keys=True)
+        return hashlib.sha1(serialized.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+    @contextmanager
+    def _keep_lease(self, job: ClaimedJob) -> Iterator[threading.Event]:
+        stop = threading.Event()
+        lease_lost = threading.Event()
+
+        def renew() -> None:
+            while not stop.wait(self.lease_seconds / 3):
+                if not self.heartbeat(job):
+                    lease_lost.set()
+                    return
+
+        thread = threading.Thread(target=renew, name=f"lease-{job.job_id}", daemon=True)
+        thread.start()
+        try:
+            yield lease_lost
+        finally:
+            stop.set()
+            thread.join()
+
+    def _release(
+        self,
+        job: ClaimedJob,
+        target_path: Path,
+    ) -> bool:
+        try:
+            job.path.rename(target_path)
+        except FileNotFoundError:
+            logger.warning(f"Job {job.job_id} is no longer leased by worker {self.worker_id}, dropping its outcome.")
+            return False
+
+        return True
+
+    def _find_job(self, job_id: str) -> Path | None:
+        for state in (self.PENDING, self.DONE, self.FAILED):
+            path = self.queue_root / state / f"{job_id}.json"
+            if path.exists():
+                return path
+
+        claim_pattern = f"{job_id}{self.WORKER_SEPARATOR}*.json"
+        claimed_paths = [
+            *(self.queue_root / self.CLAIMED).glob(claim_pattern),
+            *(self.queue_root / self.TMP).glob(claim_pattern),
+        ]
+        return claimed_paths[0] if len(claimed_paths) > 0 else None
+
+    def _filesystem_now(self) -> float:
+        """Reads the current time from the shared filesystem by touching a stamp file.
+
+        On NFS the server sets the modification time of a touched file, so leases are compared against a single
+        clock and skew between hosts does not matter. SMB/CIFS clients set it from their own clock instead, so
+        there the clocks of all hosts must be synchronized to well below `lease_seconds`.
+        """
+        stamp_path = self.queue_root / self.TMP / f"clock-{self.worker_id}"
+        stamp_path.touch()
+        return stamp_path.stat().st_mtime
+
+    def _write_json_atomically(
+        self,
+        path: Path,
+        content: dict[str, Any],
+    ) -> None:
+        tmp_path = self.queue_root / self.TMP / f"{path.name}.{uuid.uuid4().hex}.tmp"
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(content, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(path)
+
+    @staticmethod
+    def _read_json(path: Path) -> dict[str, Any]:
+        with path.open(encoding="utf-8") as f:
+            return json.load(f)
@@ -0,0 +1,139 @@
+import os
+from pathlib import Path
+import tempfile
+import time
+
+from miniature_sorter.work_queue import SharedWorkQueue
+
+
+def test_claim_and_complete():
+    with tempfile.TemporaryDirectory() as queue_root:
+        queue = SharedWorkQueue(Path(queue_root))
+        job_id = queue.submit("echo", {"value": 1})
+
+        job = queue.claim()
+        assert job is not None
+        assert job.job_id == job_id
+        assert job.attempts == 1
+        assert queue.claim() is None
+
+        assert queue.complete(job, {"value": 1})
+        summary = queue.summarize()
+        assert summary["done"] == 1
+        assert summary["per_kind"]["echo"]["results"] == [{"value": 1}]
+
+
+def test_resubmission_is_ignored():
+    with tempfile.TemporaryDirectory() as queue_root:
+        queue = SharedWorkQueue(Path(queue_root))
+        first_id = queue.submit("echo", {"value": 1})
+        second_id = queue.submit("echo", {"value": 1})
+
+        assert first_id == second_id
+        assert queue.count(SharedWorkQueue.PENDING) == 1
+
+
+def test_expired_lease_is_reclaimed():
+    with tempfile.TemporaryDirectory() as queue_root:
+        crashed_worker = SharedWorkQueue(Path(queue_root), lease_seconds=60, worker_id="crashed")
+        healthy_worker = SharedWorkQueue(Path(queue_root), lease_seconds=60, worker_id="healthy")
+        crashed_worker.submit("echo", {"value": 1})
+
+        job = crashed_worker.claim()
+        assert healthy_worker.reclaim_expired() == 0
+
+        stale_time = job.path.stat().st_mtime - 120
+        os.utime(job.path, (stale_time, stale_time))
+        assert healthy_worker.reclaim_expired() == 1
+
+        reclaimed_job = healthy_worker.claim()
+        assert reclaimed_job.job_id == job.job_id
+        assert reclaimed_job.attempts == 2
+        assert not crashed_worker.complete(job)
+        assert healthy_worker.complete(reclaimed_job)
+
+
+def test_worker_retries_and_records_failures():
+    def broken(payload, lease_lost):
+        raise RuntimeError(payload["value"])
+
+    with tempfile.TemporaryDirectory() as queue_root:
+        queue = SharedWorkQueue(Path(queue_root), max_attempts=2)
+        queue.submit("broken", {"value": 1})
+        queue.submit("echo", {"value": 2})
+
+        completed = queue.run_worker({"broken": broken, "echo": lambda payload, lease_lost: payload}, poll_interval=0)
+
+        summary = queue.summarize()
+        assert completed == 1
+        assert summary["done"] == 1
+        assert summary["failed"] == 1
+        assert summary["failures"][0]["kind"] == "broken"
+
+
+def test_long_pending_job_is_not_reclaimed_on_claim():
+    with tempfile.TemporaryDirectory() as queue_root:
+        worker = SharedWorkQueue(Path(queue_root), lease_seconds=60, worker_id="worker")
+        other_worker = SharedWorkQueue(Path(queue_root), lease_seconds=60, worker_id="other")
+        job_id = worker.submit("echo", {"value": 1})
+
+        pending_path = Path(queue_root) / SharedWorkQueue.PENDING / f"{job_id}.json"
+        stale_time = pending_path.stat().st_mtime - 3600
+        os.utime(pending_path, (stale_time, stale_time))
+
+        job = worker.claim()
+        assert other_worker.reclaim_expired() == 0
+        assert worker.complete(job)
+
+
+def test_handler_is_told_about_lost_lease():
+    seen_lease_lost = []
+
+    def slow(payload, lease_lost):
+        if len(seen_lease_lost) > 0:
+            return payload
+
+        # Simulates another worker reclaiming the job while this one is still running it.
+        claimed_path = next((Path(queue_root) / SharedWorkQueue.CLAIMED).glob("*.json"))
+        job_id = claimed_path.stem.split(SharedWorkQueue.WORKER_SEPARATOR)[0]
+        claimed_path.rename(Path(queue_root) / SharedWorkQueue.PENDING / f"{job_id}.json")
+        seen_lease_lost.append(lease_lost.wait(timeout=5))
+        raise RuntimeError("stopped")
+
+    with tempfile.TemporaryDirectory() as queue_root:
+        queue = SharedWorkQueue(Path(queue_root), lease_seconds=0.3)
+        queue.submit("slow", {"value": 1})
+
+        completed = queue.run_worker({"slow": slow}, poll_interval=0)
+
+        assert seen_lease_lost == [True]
+        assert completed == 1
+        assert queue.count(SharedWorkQueue.FAILED) == 0
+
+
+def test_reclaim_during_claim_does_not_duplicate_job():
+    with tempfile.TemporaryDirectory() as queue_root:
+        worker = SharedWorkQueue(Path(queue_root), lease_seconds=60, worker_id="worker")
+        other_worker = SharedWorkQueue(Path(queue_root), lease_seconds=60, worker_id="other")
+        job_id = worker.submit("echo", {"value": 1})
+
+        # The other worker's clock runs far ahead, as if it had seen the claim before its mtime was refreshed.
+        other_worker._filesystem_now = lambda: time.time() + 3600
+        read_json = worker._read_json
+        reclaimed = []
+
+        def read_json_and_reclaim(path):
+            # The other worker reclaims expired jobs between reading the claim and writing it back.
+            content = read_json(path)
+            reclaimed.append(other_worker.reclaim_expired())
+            return content
+
+        worker._read_json = read_json_and_reclaim
+        job = worker.claim()
+        worker._read_json = read_json
+
+        assert reclaimed == [0]
+        assert job is not None
+        assert other_worker.claim() is None
+        assert worker.count(SharedWorkQueue.PENDING) == 0
+        assert worker.complete(job)